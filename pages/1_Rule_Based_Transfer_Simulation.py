@@ -1,8 +1,18 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from utils.data_utils import load_data, add_position_group_column
-from utils.power_rankings import get_team_ratings, get_league_ratings
+import numpy as np
+from utils.data_utils import (
+    load_data,
+    add_position_group_column,
+    get_metric_columns,
+    build_player_row_index,
+    build_position_group_means,
+)
+from utils.power_rankings import (
+    get_team_ratings,
+    get_league_ratings,
+    build_team_rating_map,
+)
 from utils.transfer_simulator import simulate_player_transfer
 
 st.set_page_config(page_title="Rule-Based Transfer Simulation", layout="wide")
@@ -17,23 +27,117 @@ st.caption(
 st.divider()
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
 def load_cached_data():
     df = load_data("data/filtered_leagues.csv")
     df = add_position_group_column(df)
     return df
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_season_data(season="2025-26"):
+    df = load_cached_data()
+    return df[df["Season"] == season].reset_index(drop=True)
+
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_player_list(season="2025-26"):
+    return tuple(sorted(load_season_data(season)["Player"].unique().tolist()))
+
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_player_lookup(season="2025-26"):
+    return (
+        load_season_data(season)
+        .drop_duplicates("Player")
+        .set_index("Player")[["Parent Team", "League", "Position", "Age"]]
+        .to_dict("index")
+    )
+
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_team_leagues(season="2025-26"):
+    return (
+        load_season_data(season)
+        .drop_duplicates("Parent Team")
+        .set_index("Parent Team")["League"]
+        .to_dict()
+    )
+
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_metric_columns(season="2025-26"):
+    return get_metric_columns(load_season_data(season))
+
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_player_row_index(season="2025-26"):
+    return build_player_row_index(load_season_data(season))
+
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_position_group_means(season="2025-26"):
+    season_df = load_season_data(season)
+    metric_columns = load_metric_columns(season)
+    return {
+        by: build_position_group_means(season_df, metric_columns, by)
+        for by in ("Parent Team", "League")
+    }
+
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
 def load_team_ratings():
     return get_team_ratings()
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_team_rating_map():
+    return build_team_rating_map(load_team_ratings())
+
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
 def load_league_ratings():
     return get_league_ratings()
 
 
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
+def load_team_list():
+    return tuple(sorted(load_team_ratings()["contestantName"].cat.categories))
+
+
+def _comparison_chart(metrics_list, current_values, predicted_values):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    fig.add_trace(
+        go.Bar(
+            name="Current Performance",
+            x=metrics_list,
+            y=current_values,
+            marker_color="lightblue",
+        )
+    )
+
+    fig.add_trace(
+        go.Bar(
+            name="Predicted Performance",
+            x=metrics_list,
+            y=predicted_values,
+            marker_color="lightcoral",
+        )
+    )
+
+    fig.update_layout(
+        title="Current vs Predicted Performance Metrics",
+        xaxis_title="Metrics",
+        yaxis_title="Value",
+        barmode="group",
+        height=400,
+    )
+    return fig
+
+
 # Load data
 df = load_cached_data()
 team_ratings_df = load_team_ratings()
@@ -63,250 +167,254 @@ with st.expander("View League Ratings Data"):
 
 st.markdown("---")
 
-# Simulation Configuration
-st.header("2. Transfer Simulation Configuration")
-st.markdown(
-    """
-    Configure the transfer scenario by selecting a player, potential destination team,
-    and the metrics you want to simulate. The model will apply scaling factors based on
-    the competitive differences between leagues and teams.
-    """
-)
-
-filtered_df = df[df["Season"] == "2025-26"].copy()
-
-col1, col2 = st.columns(2)
-
-with col1:
-    st.subheader("Player Selection")
-    player_name = st.selectbox(
-        "Select Player",
-        options=sorted(filtered_df["Player"].unique()),
-        help="Choose the player whose transfer you want to simulate",
-    )
 
-    # Display current player info
-    player_info = filtered_df[filtered_df["Player"] == player_name].iloc[0]
-    st.info(
-        f"""
-        **Current Team:** {player_info['Parent Team']}  
-        **Current League:** {player_info['League']}  
-        **Position:** {player_info['Position']}  
-        **Age:** {player_info['Age']}
+@st.fragment
+def simulation_panel():
+    # Simulation Configuration
+    st.header("2. Transfer Simulation Configuration")
+    st.markdown(
+        """
+        Configure the transfer scenario by selecting a player, potential destination team,
+        and the metrics you want to simulate. The model will apply scaling factors based on
+        the competitive differences between leagues and teams.
         """
     )
 
-with col2:
-    st.subheader("Destination Selection")
-    potential_team = st.selectbox(
-        "Select Potential Team",
-        options=sorted(team_ratings_df["contestantName"].unique()),
-        help="Choose the destination team for the transfer",
-    )
+    filtered_df = load_season_data()
+    player_lookup = load_player_lookup()
+    team_to_league = load_team_leagues()
 
-    # Find corresponding league
-    potential_league_match = filtered_df[filtered_df["Parent Team"] == potential_team]
-    if not potential_league_match.empty:
-        potential_league = potential_league_match["League"].iloc[0]
-        st.info(f"**Destination League:** {potential_league}")
-    else:
-        potential_league = None
-        st.warning("League information not available for selected team")
+    col1, col2 = st.columns(2)
 
-st.subheader("Simulation Parameters")
+    with col1:
+        st.subheader("Player Selection")
+        player_name = st.selectbox(
+            "Select Player",
+            options=load_player_list(),
+            help="Choose the player whose transfer you want to simulate",
+        )
 
-col1, col2 = st.columns(2)
+        # Display current player info
+        player_info = player_lookup[player_name]
+        st.info(
+            f"""
+            **Current Team:** {player_info['Parent Team']}  
+            **Current League:** {player_info['League']}  
+            **Position:** {player_info['Position']}  
+            **Age:** {player_info['Age']}
+            """
+        )
 
-with col1:
-    metrics_columns = filtered_df.columns[
-        filtered_df.columns.get_loc("Goals") : filtered_df.columns.get_loc(
-            "Penalty conversion, %"
+    with col2:
+        st.subheader("Destination Selection")
+        potential_team = st.selectbox(
+            "Select Potential Team",
+            options=load_team_list(),
+            help="Choose the destination team for the transfer",
         )
-        + 1
-    ]
-    metrics = st.multiselect(
-        "Select Metrics to Simulate",
-        options=metrics_columns,
-        default=["Goals", "Assists"],
-        help="Choose which performance metrics to predict after the transfer",
-    )
 
-with col2:
-    apply_position_group_scaling = st.checkbox(
-        "Apply Position-Specific Scaling",
-        value=False,
-        help="Apply additional scaling factors based on player position group",
-    )
+        # Find corresponding league
+        potential_league = team_to_league.get(potential_team)
+        if potential_league is not None:
+            st.info(f"**Destination League:** {potential_league}")
+        else:
+            st.warning("League information not available for selected team")
 
-st.markdown("---")
+    st.subheader("Simulation Parameters")
 
-# Run Simulation
-st.header("3. Simulation Results")
+    col1, col2 = st.columns(2)
 
-if st.button("Run Transfer Simulation", type="primary"):
-    if not metrics:
-        st.error("Please select at least one metric to simulate")
-    elif potential_league is None:
-        st.error("Could not determine destination league. Please select a valid team.")
-    else:
-        with st.spinner("Running simulation..."):
-            simulation_result = simulate_player_transfer(
-                player_name=player_name,
-                df_2025_26=filtered_df,
-                metrics=metrics,
-                potential_team=potential_team,
-                potential_league=potential_league,
-                team_ratings_df=team_ratings_df,
-                league_ratings=league_ratings,
-                apply_position_group_scaling=apply_position_group_scaling,
-            )
+    with col1:
+        metrics = st.multiselect(
+            "Select Metrics to Simulate",
+            options=load_metric_columns(),
+            default=["Goals", "Assists"],
+            help="Choose which performance metrics to predict after the transfer",
+        )
 
-        if isinstance(simulation_result, str):
-            st.error(simulation_result)
-        else:
-            st.success("Simulation completed successfully!")
-
-            # Extract data
-            current_context = simulation_result.get("Current Context", {})
-            potential_context = simulation_result.get("Potential Context", {})
-            position_averages = simulation_result.get("Position Group Averages", {})
-
-            # Display scenario overview
-            st.subheader("Transfer Scenario Overview")
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.markdown("**Current Situation**")
-                st.metric("Team", current_context.get("Team", "N/A"))
-                st.metric("League", current_context.get("League", "N/A"))
-                st.metric("Team Rating", f"{current_context.get('Team Rating', 0):.1f}")
-                st.metric(
-                    "League Rating", f"{current_context.get('League Rating', 0):.1f}"
-                )
+    with col2:
+        apply_position_group_scaling = st.checkbox(
+            "Apply Position-Specific Scaling",
+            value=False,
+            help="Apply additional scaling factors based on player position group",
+        )
 
-            with col2:
-                st.markdown("**Potential Destination**")
-                st.metric("Team", potential_context.get("Team", "N/A"))
-                st.metric("League", potential_context.get("League", "N/A"))
-                st.metric(
-                    "Team Rating", f"{potential_context.get('Team Rating', 0):.1f}"
-                )
-                st.metric(
-                    "League Rating", f"{potential_context.get('League Rating', 0):.1f}"
-                )
+    st.markdown("---")
 
-            st.markdown("---")
+    # Run Simulation
+    st.header("3. Simulation Results")
 
-            # Performance metrics comparison
-            st.subheader("Performance Metrics Comparison")
-            st.markdown(
-                """
-                The table below compares current performance metrics with predicted performance 
-                at the destination team, accounting for competitive differences.
-                """
+    if st.button("Run Transfer Simulation", type="primary"):
+        if not metrics:
+            st.error("Please select at least one metric to simulate")
+        elif potential_league is None:
+            st.error(
+                "Could not determine destination league. Please select a valid team."
             )
+        else:
+            with st.spinner("Running simulation..."):
+                simulation_result = simulate_player_transfer(
+                    player_name=player_name,
+                    df_2025_26=filtered_df,
+                    metrics=metrics,
+                    potential_team=potential_team,
+                    potential_league=potential_league,
+                    team_ratings_df=team_ratings_df,
+                    league_ratings=league_ratings,
+                    apply_position_group_scaling=apply_position_group_scaling,
+                    player_row_index=load_player_row_index(),
+                    position_group_means=load_position_group_means(),
+                    team_rating_map=load_team_rating_map(),
+                )
 
-            current_metrics = current_context.get("Metrics", {})
-            potential_metrics = potential_context.get("Metrics", {})
-
-            # Create comparison dataframe
-            comparison_data = []
-            for metric in metrics:
-                current_val = current_metrics.get(metric)
-                potential_val = potential_metrics.get(metric)
-
-                if current_val is not None and potential_val is not None:
-                    change = potential_val - current_val
-                    change_pct = (change / current_val * 100) if current_val != 0 else 0
+            if isinstance(simulation_result, str):
+                st.error(simulation_result)
+            else:
+                st.success("Simulation completed successfully!")
+
+                # Extract data
+                current_context = simulation_result.get("Current Context", {})
+                potential_context = simulation_result.get("Potential Context", {})
+                position_averages = simulation_result.get("Position Group Averages", {})
+
+                # Display scenario overview
+                st.subheader("Transfer Scenario Overview")
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.markdown("**Current Situation**")
+                    st.metric("Team", current_context.get("Team", "N/A"))
+                    st.metric("League", current_context.get("League", "N/A"))
+                    st.metric(
+                        "Team Rating", f"{current_context.get('Team Rating', 0):.1f}"
+                    )
+                    st.metric(
+                        "League Rating",
+                        f"{current_context.get('League Rating', 0):.1f}",
+                    )
 
-                    comparison_data.append(
-                        {
-                            "Metric": metric,
-                            "Current": f"{current_val:.2f}",
-                            "Predicted": f"{potential_val:.2f}",
-                            "Change": f"{change:+.2f}",
-                            "Change %": f"{change_pct:+.1f}%",
-                        }
+                with col2:
+                    st.markdown("**Potential Destination**")
+                    st.metric("Team", potential_context.get("Team", "N/A"))
+                    st.metric("League", potential_context.get("League", "N/A"))
+                    st.metric(
+                        "Team Rating", f"{potential_context.get('Team Rating', 0):.1f}"
+                    )
+                    st.metric(
+                        "League Rating",
+                        f"{potential_context.get('League Rating', 0):.1f}",
                     )
 
-            comparison_df = pd.DataFrame(comparison_data)
-            st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+                st.markdown("---")
 
-            # Visualization
-            st.subheader("Visual Comparison")
+                # Performance metrics comparison
+                st.subheader("Performance Metrics Comparison")
+                st.markdown(
+                    """
+                    The table below compares current performance metrics with predicted performance 
+                    at the destination team, accounting for competitive differences.
+                    """
+                )
 
-            if len(comparison_data) > 0:
-                fig = go.Figure()
+                current_metrics = current_context.get("Metrics", {})
+                potential_metrics = potential_context.get("Metrics", {})
 
-                metrics_list = [item["Metric"] for item in comparison_data]
-                current_values = [float(item["Current"]) for item in comparison_data]
-                predicted_values = [
-                    float(item["Predicted"]) for item in comparison_data
+                # Create comparison dataframe
+                metrics_list = [
+                    metric
+                    for metric in metrics
+                    if current_metrics.get(metric) is not None
+                    and potential_metrics.get(metric) is not None
                 ]
-
-                fig.add_trace(
-                    go.Bar(
-                        name="Current Performance",
-                        x=metrics_list,
-                        y=current_values,
-                        marker_color="lightblue",
-                    )
+                current_values = np.fromiter(
+                    (current_metrics[metric] for metric in metrics_list),
+                    dtype=np.float64,
+                    count=len(metrics_list),
                 )
-
-                fig.add_trace(
-                    go.Bar(
-                        name="Predicted Performance",
-                        x=metrics_list,
-                        y=predicted_values,
-                        marker_color="lightcoral",
-                    )
+                predicted_values = np.fromiter(
+                    (potential_metrics[metric] for metric in metrics_list),
+                    dtype=np.float64,
+                    count=len(metrics_list),
+                )
+                change = predicted_values - current_values
+                change_pct = np.divide(
+                    change * 100,
+                    current_values,
+                    out=np.zeros_like(change),
+                    where=current_values != 0,
                 )
 
-                fig.update_layout(
-                    title="Current vs Predicted Performance Metrics",
-                    xaxis_title="Metrics",
-                    yaxis_title="Value",
-                    barmode="group",
-                    height=400,
+                comparison_df = pd.DataFrame(
+                    {
+                        "Metric": metrics_list,
+                        "Current": current_values,
+                        "Predicted": predicted_values,
+                        "Change": change,
+                        "Change %": change_pct,
+                    }
+                )
+                st.dataframe(
+                    comparison_df.style.format(
+                        {
+                            "Current": "{:.2f}",
+                            "Predicted": "{:.2f}",
+                            "Change": "{:+.2f}",
+                            "Change %": "{:+.1f}%",
+                        }
+                    ),
+                    use_container_width=True,
+                    hide_index=True,
                 )
 
-                st.plotly_chart(fig, use_container_width=True)
+                # Visualization
+                st.subheader("Visual Comparison")
 
-            # Position-specific scaling details
-            if apply_position_group_scaling and position_averages:
-                st.subheader("Position Group Scaling Details")
-                st.markdown(
-                    """
-                    These averages show how players in the same position group perform 
-                    at each team and league, used to apply position-specific adjustments.
-                    """
-                )
+                if len(metrics_list) > 0:
+                    fig = _comparison_chart(
+                        metrics_list, current_values, predicted_values
+                    )
+                    st.plotly_chart(fig, use_container_width=True)
+
+                # Position-specific scaling details
+                if apply_position_group_scaling and position_averages:
+                    st.subheader("Position Group Scaling Details")
+                    st.markdown(
+                        """
+                        These averages show how players in the same position group perform 
+                        at each team and league, used to apply position-specific adjustments.
+                        """
+                    )
 
-                position_data = []
-                for metric, averages in position_averages.items():
-                    if all(v is not None for v in averages.values()):
-                        position_data.append(
-                            {
-                                "Metric": metric,
-                                "Current Team Avg": f"{averages['from_team_pos_avg']:.2f}",
-                                "Destination Team Avg": f"{averages['to_team_pos_avg']:.2f}",
-                                "Current League Avg": f"{averages['from_league_pos_avg']:.2f}",
-                                "Destination League Avg": f"{averages['to_league_pos_avg']:.2f}",
-                            }
+                    position_data = []
+                    for metric, averages in position_averages.items():
+                        if all(v is not None for v in averages.values()):
+                            position_data.append(
+                                {
+                                    "Metric": metric,
+                                    "Current Team Avg": f"{averages['from_team_pos_avg']:.2f}",
+                                    "Destination Team Avg": f"{averages['to_team_pos_avg']:.2f}",
+                                    "Current League Avg": f"{averages['from_league_pos_avg']:.2f}",
+                                    "Destination League Avg": f"{averages['to_league_pos_avg']:.2f}",
+                                }
+                            )
+
+                    if position_data:
+                        position_df = pd.DataFrame(position_data)
+                        st.dataframe(
+                            position_df, use_container_width=True, hide_index=True
+                        )
+                    else:
+                        st.info(
+                            "Position group averages not available for selected metrics"
                         )
 
-                if position_data:
-                    position_df = pd.DataFrame(position_data)
-                    st.dataframe(position_df, use_container_width=True, hide_index=True)
-                else:
-                    st.info(
-                        "Position group averages not available for selected metrics"
-                    )
+    else:
+        st.info(
+            "Configure the simulation parameters above and click 'Run Transfer Simulation' to see results"
+        )
 
-else:
-    st.info(
-        "Configure the simulation parameters above and click 'Run Transfer Simulation' to see results"
-    )
+
+simulation_panel()
 
 st.divider()
 with st.expander("View Simulation Formula"):
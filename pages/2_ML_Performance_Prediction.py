@@ -1,11 +1,6 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score, mean_absolute_error
 
 from utils.transfers_utils import generate_dummy_dataset
 
@@ -20,11 +15,61 @@ st.caption(
 )
 
 
-@st.cache_data
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
 def load_dummy_data():
     return generate_dummy_dataset()
 
 
+@st.cache_data
+def split_data(X, y):
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(X, y, test_size=0.2, random_state=42)
+
+
+@st.cache_resource
+def train_model(X_train, y_train, X_test):
+    from sklearn.linear_model import LinearRegression
+
+    model = LinearRegression()
+    model.fit(X_train, y_train)
+    return model, model.predict(X_test)
+
+
+@st.cache_data
+def evaluate_predictions(y_true, y_pred):
+    from sklearn.metrics import r2_score, mean_absolute_error
+
+    return r2_score(y_true, y_pred), mean_absolute_error(y_true, y_pred)
+
+
+def _histogram(data, **kwargs):
+    import plotly.express as px
+
+    return px.histogram(data, **kwargs)
+
+
+def _scatter(data, **kwargs):
+    import plotly.express as px
+
+    return px.scatter(data, **kwargs)
+
+
+def _add_diagonal(fig, max_val, name):
+    import plotly.graph_objects as go
+
+    fig.add_trace(
+        go.Scatter(
+            x=[0, max_val],
+            y=[0, max_val],
+            mode="lines",
+            name=name,
+            line=dict(dash="dash", color="gray"),
+        )
+    )
+    return fig
+
+
 # Generate dataset
 df = load_dummy_data()
 df_modeling = df[df["Position"] != "GK"].copy()
@@ -79,7 +124,7 @@ with tab1:
     col1, col2 = st.columns(2)
 
     with col1:
-        fig1 = px.histogram(
+        fig1 = _histogram(
             df_modeling,
             x="Goals_p90_A",
             color="Position",
@@ -90,7 +135,7 @@ with tab1:
         st.plotly_chart(fig1, use_container_width=True)
 
     with col2:
-        fig2 = px.histogram(
+        fig2 = _histogram(
             df_modeling,
             x="Goals_p90_B",
             color="Position",
@@ -112,7 +157,7 @@ with tab2:
     col1, col2 = st.columns(2)
 
     with col1:
-        fig_age_dist = px.histogram(
+        fig_age_dist = _histogram(
             df_modeling,
             x="Age",
             title="Age Distribution",
@@ -122,7 +167,7 @@ with tab2:
         st.plotly_chart(fig_age_dist, use_container_width=True)
 
     with col2:
-        fig_age_perf = px.scatter(
+        fig_age_perf = _scatter(
             df_modeling,
             x="Age",
             y="Goals_p90_A",
@@ -151,7 +196,7 @@ with tab3:
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        fig_comparison = px.scatter(
+        fig_comparison = _scatter(
             df_modeling,
             x="Goals_p90_A",
             y="Goals_p90_B",
@@ -167,15 +212,7 @@ with tab3:
         max_val = max(
             df_modeling["Goals_p90_A"].max(), df_modeling["Goals_p90_B"].max()
         )
-        fig_comparison.add_trace(
-            go.Scatter(
-                x=[0, max_val],
-                y=[0, max_val],
-                mode="lines",
-                name="Equal performance",
-                line=dict(dash="dash", color="gray"),
-            )
-        )
+        _add_diagonal(fig_comparison, max_val, "Equal performance")
 
         st.plotly_chart(fig_comparison, use_container_width=True)
 
@@ -203,28 +240,22 @@ st.markdown(
 )
 
 # Prepare features
-df_modeling["Position_encoded"] = df_modeling["Position"].map(
-    {"DF": 0, "MF": 1, "FW": 2}
-)
+POSITION_LABELS = np.array(["DF", "MF", "FW"])
+POSITION_CODES = {label: code for code, label in enumerate(POSITION_LABELS)}
+
+df_modeling["Position_encoded"] = df_modeling["Position"].map(POSITION_CODES)
 
 X = df_modeling[["Goals_p90_A", "Age", "Position_encoded"]].values
 y = df_modeling["Goals_p90_B"].values
 
 # Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+X_train, X_test, y_train, y_test = split_data(X, y)
 
-# Train model
-model = LinearRegression()
-model.fit(X_train, y_train)
-
-# Predictions
-y_pred_test = model.predict(X_test)
+# Train model and predict the test set
+model, y_pred_test = train_model(X_train, y_train, X_test)
 
 # Metrics
-test_r2 = r2_score(y_test, y_pred_test)
-test_mae = mean_absolute_error(y_test, y_pred_test)
+test_r2, test_mae = evaluate_predictions(y_test, y_pred_test)
 
 st.subheader("Model Performance Metrics")
 
@@ -268,12 +299,11 @@ test_df = pd.DataFrame(
     {
         "Actual": y_test,
         "Predicted": y_pred_test,
-        "Position": X_test[:, 2],
+        "Position": POSITION_LABELS[X_test[:, 2].astype(np.int64)],
     }
 )
-test_df["Position"] = test_df["Position"].map({0: "DF", 1: "MF", 2: "FW"})
 
-fig_pred = px.scatter(
+fig_pred = _scatter(
     test_df,
     x="Actual",
     y="Predicted",
@@ -282,16 +312,8 @@ fig_pred = px.scatter(
     labels={"Actual": "Actual Goals per 90", "Predicted": "Predicted Goals per 90"},
 )
 
-max_val = max(y_test.max(), y_pred_test.max())
-fig_pred.add_trace(
-    go.Scatter(
-        x=[0, max_val],
-        y=[0, max_val],
-        mode="lines",
-        name="Perfect prediction",
-        line=dict(dash="dash", color="gray"),
-    )
-)
+max_val = np.maximum(y_test.max(), y_pred_test.max())
+_add_diagonal(fig_pred, max_val, "Perfect prediction")
 
 st.plotly_chart(fig_pred, use_container_width=True)
 
@@ -321,7 +343,7 @@ with col4:
     input_minutes_B = st.number_input("Expected Minutes", 500, 3500, 2000, 100)
 
 if st.button("Generate Prediction", type="primary"):
-    position_encoded = {"DF": 0, "MF": 1, "FW": 2}[input_position]
+    position_encoded = POSITION_CODES[input_position]
 
     X_input = np.array([[input_goals_p90_A, input_age, position_encoded]])
     predicted_goals_p90_B = model.predict(X_input)[0]
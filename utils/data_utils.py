@@ -1,25 +1,108 @@
+import re
+import numpy as np
 import pandas as pd
-from utils.mapper import POSITION_GROUPS
+import streamlit as st
+from utils.mapper import POSITION_GROUPS, POSITION_TO_GROUP
 
+COLUMN_DTYPES = {
+    "Position": "category",
+    "Main Position": "category",
+    "Foot": "category",
+    "On loan": "category",
+    "Age": "float32",
+    "Matches played": "int32",
+    "Minutes played": "int32",
+    "Goals": "int32",
+    "Assists": "int32",
+    "xG": "float32",
+    "xA": "float32",
+}
 
-def load_data(filepath):
-    df = pd.read_csv(filepath)
+CATEGORICAL_COLUMNS = (
+    "Player",
+    "Parent Team",
+    "Team",
+    "League",
+    "Season",
+    "Position",
+    "Main Position",
+)
+
+SEASON_PATTERN = re.compile(r"(\d{4}-\d{2})")
+
+
+def _season_from_league(league):
+    match = SEASON_PATTERN.search(league)
+    return match.group(1) if match else None
+
+
+@st.cache_data(persist="disk", show_spinner=False)
+def load_data(filepath, dtype_map=None, usecols=None):
+    df = pd.read_csv(
+        filepath,
+        engine="pyarrow",
+        usecols=usecols,
+        dtype=COLUMN_DTYPES if dtype_map is None else dtype_map,
+    )
     df.rename(
         columns={"Team": "Parent Team", "Team within selected timeframe": "Team"},
         inplace=True,
     )
     df["Parent Team"] = df["Parent Team"].fillna(df["Team"])
-    df["Season"] = df["League"].str.extract(r"(\d{4}-\d{2})")
+    leagues = df["League"].astype("category")
+    df["Season"] = leagues.map(
+        {league: _season_from_league(league) for league in leagues.cat.categories}
+    )
+    for column in CATEGORICAL_COLUMNS:
+        df[column] = df[column].astype("category")
+    return downcast_numeric_columns(df)
+
+
+def downcast_numeric_columns(df):
+    for column in df.select_dtypes("float64").columns:
+        downcast = pd.to_numeric(df[column], downcast="float")
+        # Keep float64 where float32 would visibly change the values
+        if np.allclose(downcast, df[column], rtol=1e-6, equal_nan=True):
+            df[column] = downcast
+    for column in df.select_dtypes("int64").columns:
+        df[column] = pd.to_numeric(df[column], downcast="integer")
     return df
 
 
 def assign_position_group(main_position):
-    for group, positions in POSITION_GROUPS.items():
-        if main_position in positions:
-            return group
-    return "Other"
+    return POSITION_TO_GROUP.get(main_position, "Other")
 
 
 def add_position_group_column(df):
-    df["Position Group"] = df["Main Position"].apply(assign_position_group)
+    df["Position Group"] = pd.Categorical(
+        df["Main Position"].map(POSITION_TO_GROUP),
+        categories=[*POSITION_GROUPS, "Other"],
+    ).fillna("Other")
     return df
+
+
+def get_metric_columns(df):
+    metric_block = df.loc[:, "Goals":"Penalty conversion, %"]
+    return list(metric_block.select_dtypes("number").columns)
+
+
+def build_player_row_index(df):
+    """Map each player to the position of their first row in df."""
+    first_rows = np.flatnonzero(~df["Player"].duplicated().to_numpy())
+    return dict(zip(df["Player"].to_numpy()[first_rows].tolist(), first_rows.tolist()))
+
+
+def build_position_group_means(df, metric_columns, by):
+    """Return (means, key_index, group_index, col_index) with means[key, group, metric]."""
+    grouped = df.groupby([by, "Position Group"], observed=True)[metric_columns].mean()
+    keys = grouped.index.get_level_values(0).unique()
+    groups = grouped.index.get_level_values(1).unique()
+    means = (
+        grouped.reindex(pd.MultiIndex.from_product([keys, groups]))
+        .to_numpy(dtype=np.float64)
+        .reshape(len(keys), len(groups), len(metric_columns))
+    )
+    key_index = {key: i for i, key in enumerate(keys)}
+    group_index = {group: j for j, group in enumerate(groups)}
+    col_index = {metric: k for k, metric in enumerate(metric_columns)}
+    return means, key_index, group_index, col_index
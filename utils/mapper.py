@@ -103,3 +103,9 @@ POSITION_GROUPS = {
     "DF": ["CB", "LB", "LCB", "LWB", "RB", "RCB", "RWB"],
     "GK": ["GK"],
 }
+
+POSITION_TO_GROUP = {
+    position: group
+    for group, positions in POSITION_GROUPS.items()
+    for position in positions
+}
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 from utils.mapper import TEAM_NAME_MAPPING
@@ -11,31 +12,59 @@ LEAGUE_ID_TO_NAME = {
 }
 
 
-@st.cache_data
+@st.cache_data(persist="disk")
 def load_and_filter(filepath="data/power-rankings-teams.csv"):
-    df = pd.read_csv(filepath)
-    league_ids = list(LEAGUE_ID_TO_NAME.keys())
-    filtered_df = df[df["domesticLeagueId"].isin(league_ids)].copy()
-    filtered_df["contestantName"] = (
-        filtered_df["contestantName"]
-        .map(TEAM_NAME_MAPPING)
-        .fillna(filtered_df["contestantName"])
+    df = pd.read_csv(
+        filepath,
+        engine="pyarrow",
+        usecols=["domesticLeagueId", "contestantName", "currentRating"],
+        dtype={
+            "domesticLeagueId": "category",
+            "contestantName": "category",
+            "currentRating": "float32",
+        },
     )
+    league_codes = df["domesticLeagueId"].cat.categories.get_indexer(
+        list(LEAGUE_ID_TO_NAME.keys())
+    )
+    mask = np.isin(df["domesticLeagueId"].cat.codes, league_codes[league_codes >= 0])
+    filtered_df = df[mask].copy()
+    filtered_df["domesticLeagueId"] = filtered_df[
+        "domesticLeagueId"
+    ].cat.remove_unused_categories()
+    team_names = filtered_df["contestantName"].cat.remove_unused_categories()
+    # Mapping the categories folds aliases of one club into a single category
+    canonical_names = {
+        name: TEAM_NAME_MAPPING.get(name, name) for name in team_names.cat.categories
+    }
+    filtered_df["contestantName"] = team_names.map(canonical_names).astype("category")
     return filtered_df
 
 
 def get_league_ratings():
     filtered_df = load_and_filter()
-    league_avg = (
-        filtered_df.groupby("domesticLeagueId")["currentRating"]
-        .mean()
-        .round(3)
-        .to_dict()
-    )
-    league_avg_named = {LEAGUE_ID_TO_NAME[k]: v for k, v in league_avg.items()}
+    league_ids = filtered_df["domesticLeagueId"]
+    codes = league_ids.cat.codes.to_numpy()
+    ratings = filtered_df["currentRating"].to_numpy(dtype=np.float64)
+    sums = np.bincount(codes, weights=ratings)
+    counts = np.bincount(codes)
+    league_avg = np.round(sums / counts, 3)
+    league_avg_named = {
+        LEAGUE_ID_TO_NAME[league_id]: float(avg)
+        for league_id, avg in zip(league_ids.cat.categories, league_avg)
+    }
     return league_avg_named
 
 
 def get_team_ratings():
     filtered_df = load_and_filter()
     return filtered_df[["contestantName", "currentRating"]]
+
+
+def build_team_rating_map(team_ratings_df):
+    return dict(
+        zip(
+            team_ratings_df["contestantName"].tolist(),
+            team_ratings_df["currentRating"].tolist(),
+        )
+    )
@@ -1,3 +1,18 @@
+import re
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from utils.data_utils import build_position_group_means
+from utils.power_rankings import build_team_rating_map
+
+POSITION_AVG_KEYS = (
+    "from_team_pos_avg",
+    "to_team_pos_avg",
+    "from_league_pos_avg",
+    "to_league_pos_avg",
+)
+
+
 def scale_metric(
     value,
     from_team_rating,
@@ -18,41 +33,156 @@ def scale_metric(
     rating_sensitivity: Controls amplification (1.0 = linear, 2.0 = squared, 3.0 = cubed)
     position_weight: How much position context matters (0.5 = square root, 1.0 = full ratio)
     """
+    # None skips a context ratio just like 0 does (a NaN to-average does not)
+    from_team_pos_avg, to_team_pos_avg, from_league_pos_avg, to_league_pos_avg = (
+        avg or 0.0
+        for avg in (
+            from_team_pos_avg,
+            to_team_pos_avg,
+            from_league_pos_avg,
+            to_league_pos_avg,
+        )
+    )
+    scaled = scale_metrics(
+        [value],
+        from_team_rating,
+        to_team_rating,
+        from_league_rating,
+        to_league_rating,
+        [from_team_pos_avg],
+        [to_team_pos_avg],
+        [from_league_pos_avg],
+        [to_league_pos_avg],
+        use_position_scaling=use_position_scaling,
+        rating_sensitivity=rating_sensitivity,
+        position_weight=position_weight,
+    )
+    return scaled.item()
 
-    # Convert ratings to ratios (how much better/worse)
-    team_ratio = to_team_rating / from_team_rating if from_team_rating > 0 else 1
-    league_ratio = from_league_rating / to_league_rating if to_league_rating > 0 else 1
 
-    # Amplify using power function
-    team_effect = team_ratio**rating_sensitivity
-    league_effect = league_ratio**rating_sensitivity
+def _rating_ratio(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.ones(np.broadcast(numerator, denominator).shape)
+    return np.divide(numerator, denominator, out=out, where=denominator > 0)
+
+
+def _position_context(from_pos_avgs, to_pos_avgs, position_weight):
+    from_pos_avgs = np.asarray(from_pos_avgs, dtype=np.float64)
+    to_pos_avgs = np.asarray(to_pos_avgs, dtype=np.float64)
+    valid = (from_pos_avgs > 0) & (to_pos_avgs != 0)
+    out = np.ones(valid.shape)
+    ratio = np.divide(to_pos_avgs, from_pos_avgs, out=out, where=valid)
+    return ratio**position_weight
+
+
+def scale_metrics(
+    values,
+    from_team_rating,
+    to_team_rating,
+    from_league_rating,
+    to_league_rating,
+    from_team_pos_avgs=None,
+    to_team_pos_avgs=None,
+    from_league_pos_avgs=None,
+    to_league_pos_avgs=None,
+    use_position_scaling=True,
+    rating_sensitivity=2.0,
+    position_weight=1.0,
+):
+    """
+    Vectorized scale_metric - scales a whole array of metric values at once
+
+    Position averages are arrays aligned with values; missing or zero
+    averages (None/NaN/0) leave that metric's context effect at 1.0.
+    Ratings may also be arrays that broadcast against values (e.g. one row
+    per target team).
+    """
+    values = np.asarray(values, dtype=np.float64)
 
-    # Base multiplier from ratings only
-    base_multiplier = team_effect * league_effect
+    # Convert ratings to ratios (how much better/worse)
+    team_ratio = _rating_ratio(to_team_rating, from_team_rating)
+    league_ratio = _rating_ratio(from_league_rating, to_league_rating)
+
+    # Base multiplier from ratings only, amplified using power function
+    multiplier = (
+        team_ratio**rating_sensitivity
+        * league_ratio**rating_sensitivity
+        * np.ones_like(values)
+    )
 
     # Position context (only if enabled and data available)
     if use_position_scaling:
-        context_effect = 1.0
+        if from_team_pos_avgs is not None and to_team_pos_avgs is not None:
+            multiplier *= _position_context(
+                from_team_pos_avgs, to_team_pos_avgs, position_weight
+            )
+        if from_league_pos_avgs is not None and to_league_pos_avgs is not None:
+            multiplier *= _position_context(
+                from_league_pos_avgs, to_league_pos_avgs, position_weight
+            )
+
+    # Apply bounds to prevent extreme values; a NaN multiplier takes the lower bound
+    multiplier = np.where(np.isnan(multiplier), 0.3, np.clip(multiplier, 0.3, 3.0))
+
+    # Python's round is correctly rounded at half-way cases, unlike np.round
+    scaled = values * multiplier
+    rounded = [round(value, 2) for value in scaled.ravel().tolist()]
+    return np.array(rounded, dtype=np.float64).reshape(scaled.shape)
+
 
-        if from_team_pos_avg and to_team_pos_avg and from_team_pos_avg > 0:
-            ratio = to_team_pos_avg / from_team_pos_avg
-            context_effect *= ratio**position_weight
+@lru_cache(maxsize=8)
+def _league_matcher(league_names):
+    if not league_names:
+        return None
+    # Longest names first so a league is never shadowed by a shorter prefix
+    alternatives = sorted(league_names, key=len, reverse=True)
+    return re.compile("|".join(re.escape(name) for name in alternatives))
 
-        if from_league_pos_avg and to_league_pos_avg and from_league_pos_avg > 0:
-            ratio = to_league_pos_avg / from_league_pos_avg
-            context_effect *= ratio**position_weight
 
-        # Blend base and context
-        final_multiplier = base_multiplier * context_effect
-    else:
-        # No position scaling - use base only
-        final_multiplier = base_multiplier
+def _league_rating(league, league_ratings):
+    matcher = _league_matcher(tuple(league_ratings))
+    match = matcher.search(league) if matcher is not None else None
+    return league_ratings[match.group(0)] if match else 50
 
-    # Apply bounds to prevent extreme values
-    final_multiplier = max(0.3, min(final_multiplier, 3.0))
 
-    scaled_value = value * final_multiplier
-    return round(scaled_value, 2)
+def _position_group_avgs(group_means, key, position_group, metrics):
+    means, key_index, group_index, col_index = group_means
+    i = key_index.get(key)
+    g = group_index.get(position_group)
+    cols = np.array([col_index.get(metric, -1) for metric in metrics], dtype=np.intp)
+    avgs = np.full(len(metrics), np.nan)
+    if i is not None and g is not None:
+        found = cols >= 0
+        avgs[found] = means[i, g, cols[found]]
+    return avgs
+
+
+def _player_position(df, player_name, player_row_index=None):
+    if player_row_index is not None:
+        return player_row_index.get(player_name)
+    matches = np.flatnonzero((df["Player"] == player_name).to_numpy())
+    return matches[0] if len(matches) else None
+
+
+def _row_values(df, position, metrics):
+    # One bulk read as Python scalars; None where df has no such metric column
+    columns = df.columns.get_indexer(metrics)
+    found = columns >= 0
+    if not found.any():
+        return [None] * len(metrics)
+    row = df.iloc[[position], columns[found]]
+    values = iter(next(row.itertuples(index=False, name=None)))
+    return [next(values) if present else None for present in found]
+
+
+def _build_position_group_means(df, metrics):
+    # One groupby per key instead of four boolean masks per metric
+    metric_columns = [metric for metric in metrics if metric in df]
+    return {
+        by: build_position_group_means(df, metric_columns, by)
+        for by in ("Parent Team", "League")
+    }
 
 
 def simulate_player_transfer(
@@ -64,112 +194,82 @@ def simulate_player_transfer(
     team_ratings_df,
     league_ratings: dict,
     apply_position_group_scaling: bool = False,
+    position_group_means=None,
+    team_rating_map=None,
+    player_row_index=None,
 ):
-    player_row = df_2025_26[df_2025_26["Player"] == player_name]
-    if player_row.empty:
+    position = _player_position(df_2025_26, player_name, player_row_index)
+    if position is None:
         return f"Player {player_name} not found in 2025-26 data."
-    player_row = player_row.iloc[0]
+    player_row = df_2025_26.iloc[position]
 
     current_team = player_row["Parent Team"]
     current_league = player_row["League"]
     position_group = player_row.get("Position Group", None)
 
-    cur_team_rating = (
-        team_ratings_df.set_index("contestantName")
-        .get("currentRating", {})
-        .get(current_team, 50)
-    )
-    pot_team_rating = (
-        team_ratings_df.set_index("contestantName")
-        .get("currentRating", {})
-        .get(potential_team, 50)
-    )
-    cur_league_rating = None
-    pot_league_rating = None
-    for league_name in league_ratings:
-        if league_name in current_league:
-            cur_league_rating = league_ratings[league_name]
-        if league_name in potential_league:
-            pot_league_rating = league_ratings[league_name]
-    if cur_league_rating is None:
-        cur_league_rating = 50
-    if pot_league_rating is None:
-        pot_league_rating = 50
-
-    scaled_metrics = {}
-    debug_stats = {}
-    for metric in metrics:
-        value = player_row.get(metric, None)
-        if value is None:
-            scaled_metrics[metric] = None
-            debug_stats[metric] = {
-                "from_team_pos_avg": None,
-                "to_team_pos_avg": None,
-                "from_league_pos_avg": None,
-                "to_league_pos_avg": None,
-            }
-            continue
-
-        from_team_pos_avg = to_team_pos_avg = None
-        from_league_pos_avg = to_league_pos_avg = None
-
-        if apply_position_group_scaling and position_group:
-            from_team_group = df_2025_26[
-                (df_2025_26["Parent Team"] == current_team)
-                & (df_2025_26["Position Group"] == position_group)
-            ][metric]
-            to_team_group = df_2025_26[
-                (df_2025_26["Parent Team"] == potential_team)
-                & (df_2025_26["Position Group"] == position_group)
-            ][metric]
-            from_team_pos_avg = from_team_group.mean()
-            to_team_pos_avg = to_team_group.mean()
-
-            from_league_group = df_2025_26[
-                (df_2025_26["League"] == current_league)
-                & (df_2025_26["Position Group"] == position_group)
-            ][metric]
-            to_league_group = df_2025_26[
-                (df_2025_26["League"] == potential_league)
-                & (df_2025_26["Position Group"] == position_group)
-            ][metric]
-            from_league_pos_avg = from_league_group.mean()
-            to_league_pos_avg = to_league_group.mean()
-
-        scaled = scale_metric(
-            value,
-            cur_team_rating,
-            pot_team_rating,
-            cur_league_rating,
-            pot_league_rating,
-            from_team_pos_avg,
-            to_team_pos_avg,
-            from_league_pos_avg,
-            to_league_pos_avg,
-            use_position_scaling=apply_position_group_scaling,
+    if team_rating_map is None:
+        team_rating_map = build_team_rating_map(team_ratings_df)
+    cur_team_rating = team_rating_map.get(current_team, 50)
+    pot_team_rating = team_rating_map.get(potential_team, 50)
+    cur_league_rating = _league_rating(current_league, league_ratings)
+    pot_league_rating = _league_rating(potential_league, league_ratings)
+
+    row_values = _row_values(df_2025_26, position, metrics)
+    scaled_names = [
+        metric for metric, value in zip(metrics, row_values) if value is not None
+    ]
+    values = [value for value in row_values if value is not None]
+
+    debug_stats = {metric: dict.fromkeys(POSITION_AVG_KEYS) for metric in metrics}
+    from_team_pos_avgs = to_team_pos_avgs = None
+    from_league_pos_avgs = to_league_pos_avgs = None
+
+    if apply_position_group_scaling and position_group:
+        if position_group_means is None:
+            position_group_means = _build_position_group_means(df_2025_26, scaled_names)
+        team_means = position_group_means["Parent Team"]
+        league_means = position_group_means["League"]
+        from_team_pos_avgs = _position_group_avgs(
+            team_means, current_team, position_group, scaled_names
+        )
+        to_team_pos_avgs = _position_group_avgs(
+            team_means, potential_team, position_group, scaled_names
+        )
+        from_league_pos_avgs = _position_group_avgs(
+            league_means, current_league, position_group, scaled_names
+        )
+        to_league_pos_avgs = _position_group_avgs(
+            league_means, potential_league, position_group, scaled_names
         )
-        scaled_metrics[metric] = round(scaled, 2)
-        debug_stats[metric] = {
-            "from_team_pos_avg": (
-                round(from_team_pos_avg, 2) if from_team_pos_avg is not None else None
-            ),
-            "to_team_pos_avg": (
-                round(to_team_pos_avg, 2) if to_team_pos_avg is not None else None
-            ),
-            "from_league_pos_avg": (
-                round(from_league_pos_avg, 2)
-                if from_league_pos_avg is not None
-                else None
-            ),
-            "to_league_pos_avg": (
-                round(to_league_pos_avg, 2) if to_league_pos_avg is not None else None
-            ),
-        }
-
-    def to_py(val):
-        if hasattr(val, "item"):
-            return val.item()
-        return val
+
+        pos_avgs = np.round(
+            [
+                from_team_pos_avgs,
+                to_team_pos_avgs,
+                from_league_pos_avgs,
+                to_league_pos_avgs,
+            ],
+            2,
+        )
+        debug_stats.update(
+            (metric, dict(zip(POSITION_AVG_KEYS, avgs)))
+            for metric, avgs in zip(scaled_names, pos_avgs.T.tolist())
+        )
+
+    scaled = scale_metrics(
+        values,
+        cur_team_rating,
+        pot_team_rating,
+        cur_league_rating,
+        pot_league_rating,
+        from_team_pos_avgs,
+        to_team_pos_avgs,
+        from_league_pos_avgs,
+        to_league_pos_avgs,
+        use_position_scaling=apply_position_group_scaling,
+    )
+    scaled_metrics = dict.fromkeys(metrics)
+    scaled_metrics.update(zip(scaled_names, scaled.tolist()))
 
     comparison = {
         "Current Context": {
@@ -177,7 +277,7 @@ def simulate_player_transfer(
             "League": current_league,
             "Team Rating": cur_team_rating,
             "League Rating": cur_league_rating,
-            "Metrics": {m: to_py(player_row.get(m, None)) for m in metrics},
+            "Metrics": dict(zip(metrics, row_values)),
         },
         "Potential Context": {
             "Team": potential_team,
@@ -191,3 +291,96 @@ def simulate_player_transfer(
         comparison["Position Group Averages"] = debug_stats
 
     return comparison
+
+
+def simulate_player_transfer_batch(
+    player_name: str,
+    df_2025_26,
+    metrics: list,
+    potential_teams: list,
+    potential_leagues: list,
+    team_ratings_df,
+    league_ratings: dict,
+    apply_position_group_scaling: bool = False,
+    position_group_means=None,
+    team_rating_map=None,
+    player_row_index=None,
+):
+    """
+    Scale one player's metrics for many target teams at once
+
+    Returns a DataFrame with one row per potential team and one column per
+    metric; each row matches the "Potential Context" metrics that
+    simulate_player_transfer would give for that team/league pair.
+    """
+    if len(potential_leagues) != len(potential_teams):
+        raise ValueError(
+            f"Got {len(potential_teams)} potential teams but "
+            f"{len(potential_leagues)} potential leagues; they must pair up."
+        )
+    position = _player_position(df_2025_26, player_name, player_row_index)
+    if position is None:
+        return f"Player {player_name} not found in 2025-26 data."
+    player_row = df_2025_26.iloc[position]
+
+    current_team = player_row["Parent Team"]
+    current_league = player_row["League"]
+    position_group = player_row.get("Position Group", None)
+
+    if team_rating_map is None:
+        team_rating_map = build_team_rating_map(team_ratings_df)
+    cur_team_rating = team_rating_map.get(current_team, 50)
+    cur_league_rating = _league_rating(current_league, league_ratings)
+    pot_team_ratings = np.array(
+        [team_rating_map.get(team, 50) for team in potential_teams], dtype=np.float64
+    )
+    pot_league_ratings = np.array(
+        [_league_rating(league, league_ratings) for league in potential_leagues],
+        dtype=np.float64,
+    )
+
+    row_values = _row_values(df_2025_26, position, metrics)
+    values = np.array(
+        [np.nan if value is None else value for value in row_values],
+        dtype=np.float64,
+    )
+
+    from_team_pos_avgs = to_team_pos_avgs = None
+    from_league_pos_avgs = to_league_pos_avgs = None
+    if apply_position_group_scaling and position_group:
+        if position_group_means is None:
+            position_group_means = _build_position_group_means(df_2025_26, metrics)
+        team_means = position_group_means["Parent Team"]
+        league_means = position_group_means["League"]
+        from_team_pos_avgs = _position_group_avgs(
+            team_means, current_team, position_group, metrics
+        )
+        to_team_pos_avgs = np.array(
+            [
+                _position_group_avgs(team_means, team, position_group, metrics)
+                for team in potential_teams
+            ]
+        ).reshape(len(potential_teams), len(metrics))
+        from_league_pos_avgs = _position_group_avgs(
+            league_means, current_league, position_group, metrics
+        )
+        to_league_pos_avgs = np.array(
+            [
+                _position_group_avgs(league_means, league, position_group, metrics)
+                for league in potential_leagues
+            ]
+        ).reshape(len(potential_leagues), len(metrics))
+
+    scaled = scale_metrics(
+        values[None, :],
+        cur_team_rating,
+        pot_team_ratings[:, None],
+        cur_league_rating,
+        pot_league_ratings[:, None],
+        from_team_pos_avgs,
+        to_team_pos_avgs,
+        from_league_pos_avgs,
+        to_league_pos_avgs,
+        use_position_scaling=apply_position_group_scaling,
+    )
+    return pd.DataFrame(scaled, index=list(potential_teams), columns=list(metrics))
@@ -2,102 +2,117 @@ import pandas as pd
 import numpy as np
 import re
 
-
-np.random.seed(42)
+_CLUB_SUFFIX_RE = re.compile(r"\s+(U\d+|II|III|IV|B|C)$", re.IGNORECASE)
 
 
 def main_club_name(team_name):
     if not isinstance(team_name, str):
         return ""
-    return re.sub(
-        r"\s+(U\d+|II|III|IV|B|C)$", "", team_name, flags=re.IGNORECASE
-    ).strip()
+    return _CLUB_SUFFIX_RE.sub("", team_name).strip()
+
+
+def main_club_name_series(team_names):
+    """Vectorized main_club_name for a whole Series of team names"""
+    return (
+        team_names.str.replace(_CLUB_SUFFIX_RE, "", regex=True).str.strip().fillna("")
+    )
+
+
+def _club_keys(team_names):
+    # Case-insensitive main club names as a NumPy array, one per row
+    if isinstance(team_names.dtype, pd.CategoricalDtype):
+        # Normalise each category once, then expand by code (-1 picks the "")
+        categories = team_names.cat.categories.to_series()
+        keys = main_club_name_series(categories).str.casefold().to_numpy()
+        return np.append(keys, "")[team_names.cat.codes.to_numpy()]
+    return main_club_name_series(team_names).str.casefold().to_numpy()
 
 
 def get_transfers(df, season1, season2):
-    df1 = df[df["Season"] == season1][["Player", "Parent Team"]]
-    df2 = df[df["Season"] == season2][["Player", "Parent Team"]]
+    df1 = df.loc[df["Season"] == season1, ["Player", "Parent Team"]]
+    df2 = df.loc[df["Season"] == season2, ["Player", "Parent Team"]]
     merged = pd.merge(df1, df2, on="Player", suffixes=(f"_{season1}", f"_{season2}"))
-    mask = merged.apply(
-        lambda row: main_club_name(row[f"Parent Team_{season1}"]).lower()
-        != main_club_name(row[f"Parent Team_{season2}"]).lower(),
-        axis=1,
+    left, right = (
+        _club_keys(merged[f"Parent Team_{season}"]) for season in (season1, season2)
     )
-    transferred_players = merged[mask]["Player"].unique()
-    filtered = df[
-        df["Player"].isin(transferred_players) & df["Season"].isin([season1, season2])
-    ]
-    filtered = filtered.sort_values("Minutes played", ascending=False)
-    filtered = filtered.groupby(["Player", "Season"], as_index=False).first()
-    counts = filtered["Player"].value_counts()
-    valid_players = counts[counts == 2].index
-    transfers = filtered[filtered["Player"].isin(valid_players)]
-    return transfers
+    mask = left != right
+    transferred_players = set(merged.loc[mask, "Player"].tolist())
+    filtered = (
+        df[
+            df["Player"].isin(transferred_players)
+            & df["Season"].isin([season1, season2])
+        ]
+        .sort_values("Minutes played", ascending=False, kind="stable")
+        .drop_duplicates(subset=["Player", "Season"], keep="first")
+    )
+    counts = filtered.groupby("Player", observed=True).size()
+    valid_players = counts.index[counts.to_numpy() == 2]
+    # Player and Season lead the columns, as callers expect
+    columns = ["Player", "Season"]
+    columns += [column for column in filtered.columns if column not in columns]
+    transfers = filtered.loc[filtered["Player"].isin(valid_players), columns]
+    return transfers.reset_index(drop=True)
 
 
 def generate_dummy_dataset():
     """Generate realistic dummy transfer data"""
     n_players = 2000
-    positions = ["GK", "DF", "MF", "FW"]
+    rng = np.random.default_rng(42)
+    positions = np.array(["GK", "DF", "MF", "FW"])
     position_weights = [0.1, 0.3, 0.35, 0.25]
-    data = []
-
-    for i in range(n_players):
-        player_name = f"Player_{i+1}"
-        position = np.random.choice(positions, p=position_weights)
-        age = int(np.clip(np.random.normal(26, 4), 18, 40))
-
-        # Age factor affects performance
-        if age < 23:
-            age_factor = 0.85 + (age - 18) * 0.03
-        elif age <= 28:
-            age_factor = 1.0
-        else:
-            age_factor = 1.0 - (age - 28) * 0.02
-
-        minutes_A = np.random.randint(500, 3000)
-        minutes_B = np.random.randint(500, 3000)
-
-        # Base goal-scoring rates per 90 by position
-        if position == "GK":
-            goals_p90_A = 0.0
-            goals_p90_B = 0.0
-        elif position == "DF":
-            base_rate = np.clip(np.random.normal(0.1, 0.05), 0, 0.3)
-            goals_p90_A = base_rate * age_factor
-            goals_p90_B = goals_p90_A * np.random.uniform(0.7, 0.9)
-        elif position == "MF":
-            base_rate = np.clip(np.random.normal(0.3, 0.15), 0, 0.8)
-            goals_p90_A = base_rate * age_factor
-            goals_p90_B = goals_p90_A * np.random.uniform(0.65, 0.85)
-        else:  # FW
-            base_rate = np.clip(np.random.normal(0.6, 0.2), 0.1, 1.2)
-            goals_p90_A = base_rate * age_factor
-            goals_p90_B = goals_p90_A * np.random.uniform(0.6, 0.8)
-
-        # Calculate total goals
-        goals_A = int((goals_p90_A * minutes_A / 90))
-        goals_B = int((goals_p90_B * minutes_B / 90))
-
-        if position != "GK":
-            goals_A = max(0, goals_A + np.random.randint(-2, 3))
-            goals_B = max(0, goals_B + np.random.randint(-2, 3))
-
-        goals_p90_A = round((goals_A / minutes_A * 90), 2) if minutes_A > 0 else 0
-        goals_p90_B = round((goals_B / minutes_B * 90), 2) if minutes_B > 0 else 0
-
-        data.append(
-            {
-                "Player": player_name,
-                "Age": age,
-                "Position": position,
-                "Minutes_A": minutes_A,
-                "Minutes_B": minutes_B,
-                "Goals_A": goals_A,
-                "Goals_B": goals_B,
-                "Goals_p90_A": goals_p90_A,
-                "Goals_p90_B": goals_p90_B,
-            }
-        )
-
-    return pd.DataFrame(data)
+
+    # Base goal-scoring rates per 90 by position (indexed like positions)
+    rate_mean = np.array([0.0, 0.1, 0.3, 0.6])
+    rate_std = np.array([0.0, 0.05, 0.15, 0.2])
+    rate_min = np.array([0.0, 0.0, 0.0, 0.1])
+    rate_max = np.array([0.0, 0.3, 0.8, 1.2])
+    # Share of the League A rate retained in League B
+    retention_min = np.array([0.0, 0.7, 0.65, 0.6])
+    retention_max = np.array([0.0, 0.9, 0.85, 0.8])
+
+    position_idx = rng.choice(len(positions), size=n_players, p=position_weights)
+    age = np.clip(rng.normal(26, 4, n_players), 18, 40).astype(np.int16)
+
+    # Age factor affects performance
+    age_factor = np.where(
+        age < 23,
+        0.85 + (age - 18) * 0.03,
+        np.where(age <= 28, 1.0, 1.0 - (age - 28) * 0.02),
+    )
+
+    minutes_A = rng.integers(500, 3000, n_players, dtype=np.int32)
+    minutes_B = rng.integers(500, 3000, n_players, dtype=np.int32)
+
+    base_rate = np.clip(
+        rng.normal(rate_mean[position_idx], rate_std[position_idx]),
+        rate_min[position_idx],
+        rate_max[position_idx],
+    )
+    goals_p90_A = base_rate * age_factor
+    goals_p90_B = goals_p90_A * rng.uniform(
+        retention_min[position_idx], retention_max[position_idx]
+    )
+
+    # Calculate total goals
+    goals_A = (goals_p90_A * minutes_A / 90).astype(np.int32)
+    goals_B = (goals_p90_B * minutes_B / 90).astype(np.int32)
+
+    outfield = positions[position_idx] != "GK"
+    noise_A = rng.integers(-2, 3, n_players, dtype=np.int32)
+    noise_B = rng.integers(-2, 3, n_players, dtype=np.int32)
+    goals_A = np.where(outfield, np.maximum(0, goals_A + noise_A), goals_A)
+    goals_B = np.where(outfield, np.maximum(0, goals_B + noise_B), goals_B)
+
+    return pd.DataFrame(
+        {
+            "Player": np.char.add("Player_", np.arange(1, n_players + 1).astype(str)),
+            "Age": age,
+            "Position": positions[position_idx],
+            "Minutes_A": minutes_A,
+            "Minutes_B": minutes_B,
+            "Goals_A": goals_A,
+            "Goals_B": goals_B,
+            "Goals_p90_A": np.round(goals_A / minutes_A * 90, 2),
+            "Goals_p90_B": np.round(goals_B / minutes_B * 90, 2),
+        }
+    )